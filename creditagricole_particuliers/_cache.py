@@ -0,0 +1,58 @@
+"""
+On-disk response cache for Credit Agricole Particuliers API.
+
+Responses are stored as raw JSON bytes under ~/.cache/creditagricole, one file per key,
+readable by the owner only, and expire according to the file modification time.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "creditagricole")
+
+def _cache_path(key):
+    """return the cache file path for a key"""
+    return os.path.join(CACHE_DIR, "%s.json" % hashlib.sha1(key.encode()).hexdigest())
+
+def get(key, ttl_seconds=None):
+    """
+    Read a cached response body
+
+    Args:
+        key (str): Cache key
+        ttl_seconds (int or float, optional): Maximum age of the entry in seconds.
+                                              If None, the entry is returned whatever its age. Defaults to None.
+
+    Returns:
+        bytes: Cached response body, or None if missing or expired
+    """
+    path = _cache_path(key)
+    try:
+        if ttl_seconds is not None and time.time() - os.path.getmtime(path) > ttl_seconds:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def put(key, body):
+    """
+    Write a response body to the cache
+
+    Args:
+        key (str): Cache key
+        body (bytes): Response body
+    """
+    os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+
+    # write to a private temporary file then move it in place, readers never see a partial entry
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, _cache_path(key))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,40 @@
+"""
+JSON helpers for Credit Agricole Particuliers API.
+
+Uses orjson when it is installed and falls back to the standard json module otherwise.
+Both backends produce the same text: compact or indented by 2 spaces, non-ASCII kept as UTF-8.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumpb(obj, indent=False):
+    """
+    Serialize obj to UTF-8 encoded JSON bytes
+
+    Args:
+        obj (Any): Object to serialize
+        indent (bool, optional): Pretty-print with an indentation of 2 spaces. Defaults to False.
+
+    Returns:
+        bytes: JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+def dumps(obj, indent=False):
+    """serialize obj to a JSON string, see dumpb"""
+    return dumpb(obj, indent).decode()
+
+def loads(data):
+    """deserialize a JSON document given as str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,8 +1,8 @@
-import requests
 import json
 import os
 from datetime import datetime, timedelta
 
+from creditagricole_particuliers import _json
 from creditagricole_particuliers import operations
 from creditagricole_particuliers import iban
 
@@ -46,7 +46,7 @@ class Account:
                          grandeFamilleCode=self.grandeFamilleCode,
                          numeroCompte=self.numeroCompte)
 
-    def get_operations(self, date_start=None, date_stop=None, count=100, sleep=None):
+    def get_operations(self, date_start=None, date_stop=None, count=100, sleep=None, cache_ttl=None):
         """
         Get account operations for a specific date range
         
@@ -55,6 +55,7 @@ class Account:
             date_stop (str, optional): End date in ISO 8601 format (YYYY-MM-DD)
             count (int, optional): Maximum number of operations to retrieve. Defaults to 100.
             sleep (int or float, optional): Sleep time between paginated requests. Defaults to None.
+            cache_ttl (int or float, optional): Lifetime in seconds of the on-disk response cache. Defaults to None (no cache).
             
         Returns:
             Operations: Account operations manager instance
@@ -79,12 +80,13 @@ class Account:
             date_start=date_start,
             date_stop=date_stop,
             count=count, 
-            sleep=sleep
+            sleep=sleep,
+            cache_ttl=cache_ttl
         )
 
     def as_json(self):
         """return as json"""
-        return json.dumps(self.account)
+        return _json.dumps(self.account)
 
     def get_solde(self):
         """get solde"""
@@ -111,17 +113,7 @@ class Accounts:
     
     def __iter__(self):
         """iter"""
-        self.n = 0
-        return self
-        
-    def __next__(self):
-        """next"""
-        if self.n < len(self.accounts_list):
-            op = self.accounts_list[self.n]
-            self.n += 1
-            return op
-        else:
-            raise StopIteration
+        return iter(self.accounts_list)
 
     def search(self, num):
         """search account according to the num"""
@@ -130,12 +122,36 @@ class Accounts:
                 return acc
         raise Exception( "[error] account not found" )
 
+    def get_operations_bulk(self, account_numbers, date_start=None, date_stop=None, count=100, sleep=None, max_workers=8, cache_ttl=None):
+        """
+        Get operations for several accounts concurrently
+        
+        Args:
+            account_numbers (list[str]): Account numbers to fetch operations for
+            date_start (str, optional): Start date in ISO 8601 format (YYYY-MM-DD)
+            date_stop (str, optional): End date in ISO 8601 format (YYYY-MM-DD)
+            count (int, optional): Maximum number of operations to retrieve per account. Defaults to 100.
+            sleep (int or float, optional): Sleep time between paginated requests. Defaults to None.
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to 8.
+            cache_ttl (int or float, optional): Lifetime in seconds of the on-disk response cache. Defaults to None (no cache).
+            
+        Returns:
+            dict: Operations manager instance per account number, or the raised exception
+                  if the account is not found or its API request failed
+        """
+        def fetch(num):
+            return self.search(num).get_operations(date_start=date_start, date_stop=date_stop,
+                                                   count=count, sleep=sleep, cache_ttl=cache_ttl)
+
+        return operations._map_concurrently(fetch, account_numbers, max_workers)
+
+    def as_list(self):
+        """as list of raw accounts"""
+        return [acc.account for acc in self.accounts_list]
+
     def as_json(self):
         """as json"""
-        _accs = []
-        for acc in self.accounts_list:
-            _accs.append(acc.account)
-        return json.dumps(_accs)
+        return _json.dumps(self.as_list())
 
     def get_accounts_per_products(self):
         """
@@ -161,7 +177,7 @@ class Accounts:
                 url += "/%s/particulier/operations/" % self.session.regional_bank_url
                 url += "synthese/jcr:content.produits-valorisation.json/%s" % product_code["code"]
             
-                r = requests.get(url=url, verify=self.session.ssl_verify, cookies=self.session.cookies)
+                r = self.session.http.get(url=url, verify=self.session.ssl_verify, cookies=self.session.cookies)
                 if r.status_code != 200:
                     raise Exception("[error] get accounts: %s - %s" % (r.status_code, r.text))
                 data = r.text
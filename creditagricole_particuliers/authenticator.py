@@ -1,5 +1,6 @@
 from urllib import parse
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 
@@ -20,6 +21,10 @@ class Authenticator:
         """
         self.url = "https://www.credit-agricole.fr"
         self.ssl_verify = True
+
+        # Shared HTTP session, reuses pooled connections across requests
+        self.http = requests.Session()
+        self.http.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
         
         # Set mock configuration
         if mock_config is None:
@@ -92,8 +97,8 @@ class Authenticator:
             # get the keypad layout for the password
             url = "%s/%s/particulier/" % (self.url, self.regional_bank_url)
             url += "acceder-a-mes-comptes.authenticationKeypad.json"
-            r = requests.post(url=url,
-                            verify=self.ssl_verify)
+            r = self.http.post(url=url,
+                               verify=self.ssl_verify)
             if r.status_code != 200:
                 raise Exception("[error] keypad: %s - %s" % (r.status_code, r.text))
             data = r.text
@@ -137,11 +142,11 @@ class Authenticator:
                       'j_username': self.username,
                       'keypadId': rsp["keypadId"],
                       'j_validate': "true"}
-            r2 = requests.post(url=url,
-                              data=parse.urlencode(payload),
-                              headers=headers,
-                              verify=self.ssl_verify,
-                              cookies=r.cookies)
+            r2 = self.http.post(url=url,
+                                data=parse.urlencode(payload),
+                                headers=headers,
+                                verify=self.ssl_verify,
+                                cookies=r.cookies)
             if r2.status_code != 200:
                 raise Exception("[error] securitycheck: %s - %s" % (r2.status_code, r2.text))
                 
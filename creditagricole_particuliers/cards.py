@@ -1,8 +1,8 @@
 from json.encoder import py_encode_basestring_ascii
-import requests
 import json
 import os
 
+from creditagricole_particuliers import _json
 from creditagricole_particuliers import operations
 from creditagricole_particuliers import accounts
 
@@ -26,10 +26,13 @@ class Card:
         """str"""
         return f"Carte[compte={self.idCompte}, type={self.typeCarte}, titulaire={self.titulaire}]"
 
-    def get_operations(self):
+    def get_operations(self, cache_ttl=None):
         """
         Get deferred operations for this card
         
+        Args:
+            cache_ttl (int or float, optional): Lifetime in seconds of the on-disk response cache. Defaults to None (no cache).
+        
         Returns:
             DeferredOperations: Card deferred operations
         """
@@ -38,11 +41,12 @@ class Card:
         return operations.DeferredOperations(session=self.session, 
                                              compteIdx=account.compteIdx,
                                              grandeFamilleCode=account.grandeFamilleCode,
-                                             carteIdx=self.card["index"])
+                                             carteIdx=self.card["index"],
+                                             cache_ttl=cache_ttl)
 
     def as_json(self):
         """return as json"""
-        return json.dumps(self.card)
+        return _json.dumps(self.card)
 
 class Cards:
     def __init__(self, session):
@@ -63,24 +67,15 @@ class Cards:
 
     def __iter__(self):
         """iter"""
-        self.n = 0
-        return self
-
-    def __next__(self):
-        """next"""
-        if self.n < len(self.cards_list):
-            op = self.cards_list[self.n]
-            self.n += 1
-            return op
-        else:
-            raise StopIteration
+        return iter(self.cards_list)
+
+    def as_list(self):
+        """as list of raw cards"""
+        return [cb.card for cb in self.cards_list]
 
     def as_json(self):
         """as json"""
-        _accs = []
-        for acc in self.cards_list:
-            _accs.append(acc.card)
-        return json.dumps(_accs)
+        return _json.dumps(self.as_list())
 
     def search(self, num_last_digits):
         """search card """
@@ -89,6 +84,24 @@ class Cards:
                 return cb
         raise Exception( "[error] card not found" )
 
+    def get_operations_bulk(self, cards_last_digits, max_workers=8, cache_ttl=None):
+        """
+        Get deferred operations for several cards concurrently
+        
+        Args:
+            cards_last_digits (list[str]): Last digits of the cards to fetch operations for
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to 8.
+            cache_ttl (int or float, optional): Lifetime in seconds of the on-disk response cache. Defaults to None (no cache).
+            
+        Returns:
+            dict: DeferredOperations instance per card last digits, or the raised exception
+                  if the card is not found or its API request failed
+        """
+        def fetch(num_last_digits):
+            return self.search(num_last_digits).get_operations(cache_ttl=cache_ttl)
+
+        return operations._map_concurrently(fetch, cards_last_digits, max_workers)
+
     def get_cards_per_account(self):
         """
         Retrieves cards from the bank API
@@ -106,7 +119,7 @@ class Cards:
             url = "%s" % self.session.url
             url += "/%s/particulier/operations/" % self.session.regional_bank_url
             url += "moyens-paiement/gestion-carte-v2/mes-cartes/jcr:content.listeCartesParCompte.json"
-            r = requests.get(url=url, verify=self.session.ssl_verify, cookies=self.session.cookies)
+            r = self.session.http.get(url=url, verify=self.session.ssl_verify, cookies=self.session.cookies)
             if r.status_code != 200:
                 raise Exception( "[error] get cards: %s - %s" % (r.status_code, r.text) )
             
@@ -1,5 +1,4 @@
 import json
-import requests
 import os
 
 class Iban:
@@ -43,7 +42,7 @@ class Iban:
             url += "/%s/particulier/operations/" % self.session.regional_bank_url
             url += "operations-courantes/editer-rib/"
             url += "jcr:content.ibaninformation.json?compteIdx=%s&grandeFamilleCode=%s" % (self.compteIdx,self.grandeFamilleCode)
-            r = requests.get(url=url, verify=self.session.ssl_verify, cookies=self.session.cookies)
+            r = self.session.http.get(url=url, verify=self.session.ssl_verify, cookies=self.session.cookies)
             if r.status_code != 200:
                 raise Exception( "[error] get_iban_data: %s - %s" % (r.status_code, r.text) )
             data = r.text
@@ -1,4 +1,3 @@
-import requests
 import os
 import json
 
@@ -32,9 +31,9 @@ class Logout:
             url = "%s" % self.session.url
             url += "/%s/particulier.npc.logout.html?resource=" % self.session.regional_bank_url
             url += "/content/ca/cr866/npc/fr/particulier.html"
-            r = requests.get(url=url,
-                            verify=self.session.ssl_verify,
-                            cookies=self.session.cookies)
+            r = self.session.http.get(url=url,
+                                      verify=self.session.ssl_verify,
+                                      cookies=self.session.cookies)
             if r.status_code != 200:
                 raise Exception( "[error] logout: %s - %s" % (r.status_code, r.text) )
             
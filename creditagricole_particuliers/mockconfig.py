@@ -4,9 +4,10 @@ MockConfig module for Credit Agricole Particuliers API.
 This module provides configuration for mocking API requests in tests and development.
 """
 
-import json
 import os
 
+from creditagricole_particuliers import _json
+
 class MockConfig:
     def __init__(self, useMocksDir=None, writeMocksDir=None, useMockSuffix="mock", writeMockSuffix="mock"):
         """
@@ -24,6 +25,7 @@ class MockConfig:
         self.writeMocksDir = writeMocksDir
         self.useMockSuffix = useMockSuffix
         self.writeMockSuffix = writeMockSuffix
+        self._created_dirs = set()
     
     def useMocks(self):
         return self.useMocksDir is not None
@@ -44,11 +46,13 @@ class MockConfig:
         """
         if self.writeMocksDir is None:
             return None
-        os.makedirs(self.writeMocksDir, exist_ok=True)
+        if self.writeMocksDir not in self._created_dirs:
+            os.makedirs(self.writeMocksDir, exist_ok=True)
+            self._created_dirs.add(self.writeMocksDir)
         mock_path = os.path.join(self.writeMocksDir, mock_file)
         
-        with open(mock_path, 'w') as f:
-            json.dump(content, f, indent=2)
+        with open(mock_path, 'wb') as f:
+            f.write(_json.dumpb(content, indent=True))
             
         return mock_path
     
@@ -60,7 +64,7 @@ class MockConfig:
             mock_file (str): Base filename to read from (relative to useMocksDir). Suffix will be applied.
                 
         Returns:
-            str: File content as a string
+            str: File content as a string, decoded as UTF-8
             
         Raises:
             FileNotFoundError: If the file is not found
@@ -68,7 +72,7 @@ class MockConfig:
             
         if self.useMocksDir is not None:
             mock_path = os.path.join(self.useMocksDir, mock_file)
-            with open(mock_path, 'r') as f:
+            with open(mock_path, 'r', encoding='utf-8') as f:
                 return f.read()
         return None
     
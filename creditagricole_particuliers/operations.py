@@ -1,16 +1,100 @@
-import requests
-import json
+import logging
+import operator
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib import parse
 import os
 from datetime import datetime, timedelta
 
+import requests
+
+from creditagricole_particuliers import _cache
+from creditagricole_particuliers import _json
+
+logger = logging.getLogger(__name__)
+
+def _get_stale(key, cache_ttl, error):
+    """return the cached copy whatever its age, warning that it is served in place of a failed request"""
+    data = _cache.get(key) if cache_ttl is not None else None
+    if data is not None:
+        logger.warning("%s, serving stale cached copy", error)
+    return data
+
+def _get(session, url, params, cache_ttl, error):
+    """
+    Performs a GET request and returns the raw response body, going through the on-disk cache if enabled
+    
+    Args:
+        session (Authenticator): Authentication session
+        url (str): Resource url
+        params (dict): Query string parameters
+        cache_ttl (int or float): Cache lifetime in seconds, caching is disabled if None
+        error (str): Error message prefix
+        
+    Raises:
+        Exception: If the API request fails and no cached copy is available
+    """
+    key = "%s %s?%s" % (session.username, url, parse.urlencode(params))
+    if cache_ttl is not None:
+        data = _cache.get(key, cache_ttl)
+        if data is not None:
+            return data
+
+    # serve the stale copy, if any, when the API is unavailable
+    try:
+        r = session.http.get(url=url, params=params, verify=session.ssl_verify, cookies=session.cookies)
+    except requests.RequestException as e:
+        data = _get_stale(key, cache_ttl, "%s: %s" % (error, e))
+        if data is None:
+            raise
+        return data
+
+    if r.status_code != 200:
+        exc = Exception( "%s: %s - %s" % (error, r.status_code, r.text) )
+        data = _get_stale(key, cache_ttl, exc)
+        if data is None:
+            raise exc
+        return data
+
+    if cache_ttl is not None:
+        # the cache is only an optimization, never fail a successful request on it
+        try:
+            _cache.put(key, r.content)
+        except OSError as e:
+            logger.warning("unable to write operations cache: %s", e)
+    return r.content
+
+def _map_concurrently(fetch, keys, max_workers):
+    """
+    Calls fetch concurrently for each key
+    
+    Args:
+        fetch (callable): Function called with each key
+        keys (list): Keys to fetch
+        max_workers (int): Maximum number of concurrent calls
+        
+    Returns:
+        dict: Result per key, or the raised exception if the call failed
+    """
+    def safe_fetch(key):
+        try:
+            return fetch(key)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(keys, executor.map(safe_fetch, keys)))
+
+# Fields extracted from an operation descriptor
+_OP_FIELDS = operator.itemgetter("libelleOperation", "dateOperation", "montant")
+
 class Operation:
+    __slots__ = ("descr", "libelleOp", "dateOp", "montantOp")
+
     def __init__(self, descr):
         """class init"""
         self.descr = descr
-        self.libelleOp = descr["libelleOperation"]
-        self.dateOp = descr["dateOperation"]
-        self.montantOp = descr["montant"]
+        self.libelleOp, self.dateOp, self.montantOp = _OP_FIELDS(descr)
 
     def __str__(self):
         """stre representation"""
@@ -18,10 +102,10 @@ class Operation:
 
     def as_json(self):
         """return as json"""
-        return json.dumps(self.descr)
+        return _json.dumps(self.descr)
 
 class DeferredOperations:
-    def __init__(self, session, compteIdx, grandeFamilleCode, carteIdx):
+    def __init__(self, session, compteIdx, grandeFamilleCode, carteIdx, cache_ttl=None):
         """
         Initialize deferred card operations manager
         
@@ -30,39 +114,32 @@ class DeferredOperations:
             compteIdx (str): Account index
             grandeFamilleCode (str): Product family code
             carteIdx (str): Card index identifier
+            cache_ttl (int or float, optional): Lifetime in seconds of the on-disk response cache. Defaults to None (no cache).
         """
         self.session = session
         self.compteIdx = compteIdx
         self.grandeFamilleCode = grandeFamilleCode
         self.carteIdx = carteIdx
+        self.cache_ttl = cache_ttl
         self.list_operations = []
 
         self.get_operations()
 
     def __iter__(self):
         """iter"""
-        self.n = 0
-        return self
-        
-    def __next__(self):
-        """next"""
-        if self.n < len(self.list_operations):
-            op = self.list_operations[self.n]
-            self.n += 1
-            return op
-        else:
-            raise StopIteration
+        return iter(self.list_operations)
             
     def __len__(self):
         """Return the number of operations"""
         return len(self.list_operations)
 
+    def as_list(self):
+        """as list of raw operations"""
+        return [o.descr for o in self.list_operations]
+
     def as_json(self):
         """as json"""
-        _ops = []
-        for o in self.list_operations:
-            _ops.append(o.descr)
-        return json.dumps(_ops)
+        return _json.dumps(self.as_list())
         
     def get_operations(self):
         """
@@ -85,22 +162,20 @@ class DeferredOperations:
             url = "%s" % self.session.url
             url += "/%s/particulier/operations/synthese/detail-comptes/" % self.session.regional_bank_url
             url += "jcr:content.n3.operations.encours.carte.debit.differe.json"
-            url += "?grandeFamilleCode=%s&compteIdx=%s&carteIdx=%s" % (self.grandeFamilleCode, self.compteIdx, self.carteIdx)
-            r = requests.get(url=url, verify=self.session.ssl_verify, cookies=self.session.cookies)
-            if r.status_code != 200:
-                raise Exception( "[error] get deferred operations: %s - %s" % (r.status_code, r.text) )
-            data = r.text
+            params = {"grandeFamilleCode": self.grandeFamilleCode, "compteIdx": self.compteIdx, "carteIdx": self.carteIdx}
+            data = _get(self.session, url, params, self.cache_ttl, "[error] get deferred operations")
             
+        operations_data = _json.loads(data)
+        
         # Write mock data if requested
         if self.session.writeMocks:
-            self.session.mock_config.write_json_mock(f"{mock_file_base}_{self.session.mock_config.writeMockSuffix}.json", data)
+            self.session.mock_config.write_json_mock(f"{mock_file_base}_{self.session.mock_config.writeMockSuffix}.json", operations_data)
            
         # success, save list operations
-        for op in json.loads(data):
-            self.list_operations.append( Operation(op) )
+        self.list_operations = [Operation(op) for op in operations_data]
 
 class Operations:
-    def __init__(self, session, compteIdx, grandeFamilleCode, date_start, date_stop, count=100, sleep=None):
+    def __init__(self, session, compteIdx, grandeFamilleCode, date_start, date_stop, count=100, sleep=None, cache_ttl=None):
         """
         Initialize account operations manager
         
@@ -112,40 +187,76 @@ class Operations:
             date_stop (str): End date for operations in ISO 8601 format (YYYY-MM-DD)
             count (int, optional): Maximum number of operations to retrieve. Defaults to 100.
             sleep (int or float, optional): Sleep time between paginated requests. Defaults to None.
+            cache_ttl (int or float, optional): Lifetime in seconds of the on-disk response cache. Defaults to None (no cache).
         """
         self.session = session
         self.compteIdx = compteIdx
         self.grandeFamilleCode = grandeFamilleCode
         self.date_start = date_start
         self.date_stop = date_stop
+        self.cache_ttl = cache_ttl
         self.list_operations = []
+
+        # convert date to timestamp
+        self._ts_date_debut = int(datetime.strptime(date_start, "%Y-%m-%d").timestamp())*1000
+        self._ts_date_fin = int(datetime.strptime(date_stop, "%Y-%m-%d").timestamp())*1000
         
         self.get_operations(count=count, sleep=sleep)
 
     def __iter__(self):
         """iter"""
-        self.n = 0
-        return self
-        
-    def __next__(self):
-        """next"""
-        if self.n < len(self.list_operations):
-            op = self.list_operations[self.n]
-            self.n += 1
-            return op
-        else:
-            raise StopIteration
+        return iter(self.list_operations)
             
     def __len__(self):
         """Return the number of operations"""
         return len(self.list_operations)
 
+    def as_list(self):
+        """as list of raw operations"""
+        return [o.descr for o in self.list_operations]
+
     def as_json(self):
         """as json"""
-        _ops = []
-        for o in self.list_operations:
-            _ops.append(o.descr)
-        return json.dumps(_ops)
+        return _json.dumps(self.as_list())
+
+    def _get_operations_page(self, url, mock_file_base, startIndex, limit):
+        """
+        Retrieves a single page of account operations
+        
+        Args:
+            url (str): Operations resource url
+            mock_file_base (str): Mock file name, without suffix
+            startIndex (str): Starting index for pagination, None for the first page
+            limit (int): Number of operations to retrieve
+            
+        Returns:
+            dict: Page content, with listeOperations and the pagination fields
+            
+        Raises:
+            Exception: If the API request fails
+        """
+        if self.session.useMocks:
+            # Use the new read_json_mock method to get raw content, mocks only hold a single page of operations
+            data = self.session.mock_config.read_json_mock(f"{mock_file_base}_{self.session.mock_config.useMockSuffix}.json")
+            return {"listeOperations": _json.loads(data), "hasNext": False}
+
+        # call operations resources
+        params = {"grandeFamilleCode": self.grandeFamilleCode, "compteIdx": self.compteIdx,
+                  "idDevise": "EUR", "dateDebut": self._ts_date_debut}
+        if startIndex is not None:
+            params["startIndex"] = startIndex
+        else:
+            params["dateFin"] = self._ts_date_fin
+        params["count"] = limit
+        
+        data = _get(self.session, url, params, self.cache_ttl, "[error] get operations")
+        rsp = _json.loads(data)
+        
+        # Write mock data if requested
+        if self.session.writeMocks:
+            self.session.mock_config.write_json_mock(f"{mock_file_base}_{self.session.mock_config.writeMockSuffix}.json", rsp["listeOperations"])
+        
+        return rsp
 
     def get_operations(self, count, startIndex=None, limit=30, sleep=None):
         """
@@ -160,54 +271,24 @@ class Operations:
         Raises:
             Exception: If the API request fails
         """
-        # convert date to timestamp
-        ts_date_debut = datetime.strptime(self.date_start, "%Y-%m-%d")
-        ts_date_debut = int(ts_date_debut.timestamp())*1000
-        
-        ts_date_fin = datetime.strptime(self.date_stop, "%Y-%m-%d")
-        ts_date_fin = int(ts_date_fin.timestamp())*1000
-
-        # limit operations to 30
-        nextCount = 0
-        if count > limit:
-            nextCount = count - limit
-        
         mock_file_base = f"account-{self.grandeFamilleCode}-{self.compteIdx}_operations"
         
-        if self.session.useMocks:
-            # Use the new read_json_mock method to get raw content
-            data = self.session.mock_config.read_json_mock(f"{mock_file_base}_{self.session.mock_config.useMockSuffix}.json")
-            # Wrap the raw content in a listeOperations object
-            data = "{ \"listeOperations\": " + data + "}"
-        else:
-            # call operations resources
-            url = "%s" % self.session.url
-            url += "/%s/particulier/operations/synthese/detail-comptes/" % self.session.regional_bank_url
-            url += "jcr:content.n3.operations.json?grandeFamilleCode=%s&compteIdx=%s" % (self.grandeFamilleCode, self.compteIdx)
-            url += "&idDevise=EUR"
-            url += "&dateDebut=%s" % ts_date_debut
-            if startIndex is not None:
-                url += "&startIndex=%s" % requests.utils.quote(startIndex)
-            else:
-                url += "&dateFin=%s" % ts_date_fin
-            url += "&count=%s" % limit
-            
-            r = requests.get(url=url, verify=self.session.ssl_verify, cookies=self.session.cookies)
-            if r.status_code != 200:
-                raise Exception( "[error] get operations: %s - %s" % (r.status_code, r.text) )
-            data = r.text
+        url = "%s" % self.session.url
+        url += "/%s/particulier/operations/synthese/detail-comptes/" % self.session.regional_bank_url
+        url += "jcr:content.n3.operations.json"
+        
+        remaining = count
+        while True:
+            rsp = self._get_operations_page(url, mock_file_base, startIndex, limit)
             
-            # Write mock data if requested
-            if self.session.writeMocks:
-                operations_data = json.loads(data)["listeOperations"]
-                self.session.mock_config.write_json_mock(f"{mock_file_base}_{self.session.mock_config.writeMockSuffix}.json", operations_data)
-           
-        # success, save list operations
-        rsp = json.loads(data)
-        for op in rsp["listeOperations"]:
-            self.list_operations.append( Operation(op) )
+            # success, save list operations
+            self.list_operations.extend(Operation(op) for op in rsp["listeOperations"])
+
+            # operations are limited per request, fetch the next page if needed
+            remaining -= limit
+            if remaining <= 0 or rsp.get('hasNext') is not True or 'nextSetStartIndex' not in rsp:
+                break
+            startIndex = rsp["nextSetStartIndex"]
 
-        if nextCount > 0 and 'nextSetStartIndex' in rsp and 'hasNext' in rsp and rsp['hasNext'] is True:
             if sleep is not None and (isinstance(sleep, int) or isinstance(sleep, float)):
                 time.sleep(sleep)
-            self.get_operations(nextCount, rsp["nextSetStartIndex"])
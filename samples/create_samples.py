@@ -12,61 +12,80 @@ Mock functionality:
 - Use --mocks-dir to specify mock directory
 - Use --write-mocks to write API responses to mock files
 - Use --use-mocks to use mock data instead of API calls
+
+Operations responses are cached on disk for --cache-ttl seconds (0 to disable).
 """
 
-import json
 import os
 import sys
 import argparse
-import re
 from datetime import datetime, timedelta
 from getpass import getpass
 from typing import Any, Dict, List, Union
-from collections import defaultdict
 
 from creditagricole_particuliers import (
     authenticator, accounts, regionalbanks, cards, logout, MockConfig
 )
+from creditagricole_particuliers import _json
+
+# Directories already created by save_json
+_made_dirs = set()
 
 def save_json(data, filename, target_dir):
     """Save data to a JSON file"""
-    os.makedirs(target_dir, exist_ok=True)
-    with open(os.path.join(target_dir, filename), 'w') as f:
-        json.dump(data, f, indent=2)
+    if target_dir not in _made_dirs:
+        os.makedirs(target_dir, exist_ok=True)
+        _made_dirs.add(target_dir)
+    with open(os.path.join(target_dir, filename), 'wb') as f:
+        f.write(_json.dumpb(data, indent=True))
+
+# Placeholder values per scalar type
+_TYPE_PLACEHOLDERS = {
+    str: "",
+    int: 0,
+    float: 0.0,
+    bool: False,
+    type(None): None,
+}
 
 def convert_to_type_structure(data: Any) -> Any:
     """
     Converts real data to type structure.
     Replaces values with placeholders according to their type.
     """
-    if isinstance(data, str):
-        # Replace strings with empty string instead of "str"
-        return ""
-    elif isinstance(data, int):
-        return 0
-    elif isinstance(data, float):
-        return 0.0
-    elif isinstance(data, bool):
-        return False
-    elif isinstance(data, list):
-        if data:
-            # Only take the first element as an example
-            return [convert_to_type_structure(data[0])]
-        return []
-    elif isinstance(data, dict):
-        return {k: convert_to_type_structure(v) for k, v in data.items()}
-    elif data is None:
-        return None
-    else:
-        # For unhandled types
-        return f"type:{type(data).__name__}"
+    # Walk the tree with an explicit stack of (parent, key, value) to fill in
+    root = [None]
+    stack = [(root, 0, data)]
+    while stack:
+        parent, key, value = stack.pop()
+        value_type = type(value)
+        if value_type is dict:
+            converted = {}
+            for k, v in value.items():
+                # Reserve the key now to keep the original ordering
+                converted[k] = None
+                stack.append((converted, k, v))
+        elif value_type is list:
+            if value:
+                # Only take the first element as an example
+                converted = [None]
+                stack.append((converted, 0, value[0]))
+            else:
+                converted = []
+        elif value_type in _TYPE_PLACEHOLDERS:
+            converted = _TYPE_PLACEHOLDERS[value_type]
+        else:
+            # For unhandled types
+            converted = f"type:{value_type.__name__}"
+        parent[key] = converted
+    return root[0]
 
 def create_placeholder(original_id: str) -> str:
     """
     Creates a placeholder for an identifier by replacing all characters with '0'.
     Used to generate filenames without sensitive data.
     """
-    if re.match(r'^[0-9]+$', original_id):
+    if original_id.isdigit():
         return '0' * len(original_id)
     return 'placeholder'
 
@@ -80,6 +99,9 @@ def main():
     parser.add_argument('--mode', choices=['data', 'types'], default='data',
                        help="Generation mode: 'data' for real data (default), 'types' for structure with placeholders")
     
+    parser.add_argument('--cache-ttl', default=300, type=int,
+                       help='Lifetime in seconds of the on-disk cache for operations responses (default: 300, 0 to disable)')
+    
     # Add mock functionality arguments
     parser.add_argument('--use-mocks-dir', default=None, help='Directory for mock files to use')
     parser.add_argument('--write-mocks-dir', default=None, help='Directory for mock files to write')
@@ -105,6 +127,9 @@ def main():
     else:
         target_dir = args.output_dir
     
+    # Operations responses cache, disabled with 0
+    cache_ttl = args.cache_ttl if args.cache_ttl > 0 else None
+    
     # Ensure output directory exists
     os.makedirs(target_dir, exist_ok=True)
     
@@ -145,10 +170,15 @@ def main():
             # Save without sample suffix in data mode
             save_json(bank, f"regionalBank_{args.department}.json", target_dir)
         
+        # Operations date range: last 30 days
+        current_date = datetime.today()
+        date_stop = current_date.strftime('%Y-%m-%d')
+        date_start = (current_date - timedelta(days=30)).strftime('%Y-%m-%d')
+        
         # Get accounts
         print("Getting accounts...")
         accs = accounts.Accounts(auth)
-        accs_data = json.loads(accs.as_json())
+        accs_data = accs.as_list()
         
         # Apply type structure if needed
         if args.mode == 'types':
@@ -164,14 +194,10 @@ def main():
                 
                 print(f"Retrieving operations for example account...")
                 acc = accs.search(real_account_number)
-                current_date = datetime.today()
-                previous_date = current_date - timedelta(days=30)
-                date_stop = current_date.strftime('%Y-%m-%d')
-                date_start = previous_date.strftime('%Y-%m-%d')
                 
                 try:
-                    ops = acc.get_operations(date_start=date_start, date_stop=date_stop, count=10)
-                    ops_data = json.loads(ops.as_json())
+                    ops = acc.get_operations(date_start=date_start, date_stop=date_stop, count=10, cache_ttl=cache_ttl)
+                    ops_data = ops.as_list()
                     if ops_data:
                         # Save a global operation example
                         operation_example = convert_to_type_structure(ops_data[0])
@@ -179,33 +205,23 @@ def main():
                 except Exception as e:
                     print(f"Error retrieving operations: {e}")
         else:
-            # Group accounts by grandeFamilleProduitCode
-            accounts_by_code = defaultdict(list)
-            for account in accs_data:
-                code = account.get('grandeFamilleProduitCode', 'unknown')
-                accounts_by_code[code].append(account)
-            
             # Save all accounts into a single file
             save_json(accs_data, "accounts.json", target_dir)
             
+            # Get operations for all accounts concurrently
+            account_numbers = [account['numeroCompte'] for account in accs_data]
+            print(f"Getting operations for {len(account_numbers)} accounts...")
+            all_ops = accs.get_operations_bulk(account_numbers, date_start=date_start, date_stop=date_stop,
+                                               count=10, cache_ttl=cache_ttl)
+            
             # Process each account for operations and IBAN
-            for account in accs_data:
-                account_number = account['numeroCompte']
-                print(f"Getting operations for account {account_number}...")
-                
-                # Get operations for this account
-                acc = accs.search(account_number)
-                current_date = datetime.today()
-                previous_date = current_date - timedelta(days=30)
-                date_stop = current_date.strftime('%Y-%m-%d')
-                date_start = previous_date.strftime('%Y-%m-%d')
-                
-                try:
-                    ops = acc.get_operations(date_start=date_start, date_stop=date_stop, count=10)
-                    ops_data = json.loads(ops.as_json())
+            for account_number in account_numbers:
+                ops = all_ops[account_number]
+                if isinstance(ops, Exception):
+                    print(f"Error getting operations for account {account_number}: {ops}")
+                else:
+                    ops_data = ops.as_list()
                     save_json(ops_data, f"account_{account_number}_operations.json", target_dir)
-                except Exception as e:
-                    print(f"Error getting operations for account {account_number}: {e}")
                 
                 # Get IBAN for this account (empty object if not available)
                 print(f"Getting IBAN for account {account_number}...")
@@ -220,7 +236,7 @@ def main():
         print("Getting cards...")
         try:
             user_cards = cards.Cards(auth)
-            cards_data = json.loads(user_cards.as_json())
+            cards_data = user_cards.as_list()
             
             # Apply type structure if needed
             if args.mode == 'types':
@@ -239,8 +255,8 @@ def main():
                     try:
                         print(f"Getting card operations sample structure...")
                         card_obj = user_cards.search(real_card_last_4)
-                        deferred_ops = card_obj.get_operations()
-                        ops_data = json.loads(deferred_ops.as_json())
+                        deferred_ops = card_obj.get_operations(cache_ttl=cache_ttl)
+                        ops_data = deferred_ops.as_list()
                         if ops_data:
                             # Keep only one operation
                             operation_example = convert_to_type_structure(ops_data[0])
@@ -252,22 +268,24 @@ def main():
                 new_cards_filename = f"cards.json"
                 save_json(cards_data, new_cards_filename, target_dir)
                 
-                # Process each card individually for operations
-                for i, card in enumerate(cards_data):
+                cards_last_4 = []
+                for card in cards_data:
                     card_id = card['idCarte']
-                    card_last_4 = card_id.split()[-1][-4:] if ' ' in card_id else card_id[-4:]
+                    cards_last_4.append(card_id.split()[-1][-4:] if ' ' in card_id else card_id[-4:])
+                
+                print(f"Getting operations for {len(cards_last_4)} cards...")
+                all_deferred_ops = user_cards.get_operations_bulk(cards_last_4, cache_ttl=cache_ttl)
+                
+                # Process each card individually for operations
+                for card_last_4 in cards_last_4:
+                    deferred_ops = all_deferred_ops[card_last_4]
                     print(f"Processing card ending with {card_last_4}...")
-                    
-                    # Get operations for this card
-                    try:
-                        print(f"Getting operations for card {card_last_4}...")
-                        card_obj = user_cards.search(card_last_4)
-                        deferred_ops = card_obj.get_operations()
-                        ops_data = json.loads(deferred_ops.as_json())
+                    if isinstance(deferred_ops, Exception):
+                        print(f"Error getting operations for card {card_last_4}: {deferred_ops}")
+                    else:
+                        ops_data = deferred_ops.as_list()
                         new_operations_filename = f"card_{card_last_4}_operations.json"
                         save_json(ops_data, new_operations_filename, target_dir)
-                    except Exception as e:
-                        print(f"Error getting operations for card {card_last_4}: {e}")
             
         except Exception as e:
             print(f"Error getting cards: {e}")